@@ -12,7 +12,7 @@ echo "⚙️  Configuration Settings:"
 echo "   Name: finance-ml-service"
 echo "   Root Directory: ml-service"
 echo "   Build Command: pip install -r requirements.txt"
-echo "   Start Command: uvicorn main:app --host 0.0.0.0 --port \$PORT"
+echo "   Start Command: gunicorn main:app --preload -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:\$PORT"
 echo ""
 echo "🔧 Environment Variables (if needed):"
 echo "   PORT: (auto-set by Render)"
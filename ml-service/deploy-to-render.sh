@@ -11,7 +11,7 @@ echo "4. Connect your GitHub repository"
 echo ""
 echo "⚙️  Configuration:"
 echo "Build Command: pip install -r requirements.txt"
-echo "Start Command: uvicorn main:app --host 0.0.0.0 --port \$PORT"
+echo "Start Command: gunicorn main:app --preload -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:\$PORT"
 echo "Root Directory: ml-service (if deploying from main repo)"
 echo ""
 echo "🔗 After deployment, update src/lib/ml-prediction.ts with your new URL"
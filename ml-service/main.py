@@ -1,11 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import joblib
-import pickle
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, FiniteFloat
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, Optional
 import os
 from datetime import datetime
 import logging
@@ -14,35 +16,54 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Stock Prediction ML Service", version="1.0.0")
+app = FastAPI(
+    title="Stock Prediction ML Service",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000", 
-        "https://market-brief.vercel.app",
-        "https://market-brief-o37dpzab3-victor-wus-projects-6704a109.vercel.app",
-        "https://market-brief-git-main-victor-wus-projects-6704a109.vercel.app",
-        "*"  # Allow all origins for now - can restrict later
-    ],  # Allow Vercel domains
+    allow_origins=["http://localhost:3000"],
+    # Production and preview Vercel deployments, matched by one compiled regex
+    allow_origin_regex=r"https://market-brief(-[a-z0-9-]+)?\.vercel\.app",
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
 )
 
-# Global variables for loaded models
+# Compress larger responses; batch predictions are highly repetitive JSON
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
+# Global variables for loaded models (populated by load_models at import time)
 model = None
 scaler = None
 model_metadata = None
 
+# Scaler folded into the model weights so the model is a single sigmoid
+vix_weight = None
+vix_bias = None
+
+# p(bullish) precomputed for VIX in [0, 100] at 0.01 steps, so inference is a lookup
+VIX_TABLE_SCALE = 100
+VIX_TABLE_SIZE = 100 * VIX_TABLE_SCALE + 1
+bullish_probability_table = None
+
+# Metadata fields echoed in every batch response, looked up once at load time
+batch_model_info = None
+
 class StockData(BaseModel):
-    vix: float
+    vix: FiniteFloat
     timestamp: str = None
 
-class PredictionRequest(BaseModel):
+class LegacyPredictionRequest(BaseModel):
     stock_data: List[StockData]
 
+class PredictionRequest(BaseModel):
+    vix: List[FiniteFloat]
+    timestamps: Optional[List[Optional[str]]] = None
+
 class PredictionResponse(BaseModel):
     predictions: List[Dict[str, Any]]
     confidence_scores: List[float]
@@ -50,31 +71,74 @@ class PredictionResponse(BaseModel):
     timestamp: str
 
 def load_models():
-    """Load the trained model and scaler"""
-    global model, scaler, model_metadata
+    """Load the trained model pipeline and its metadata"""
+    global model, scaler, model_metadata, vix_weight, vix_bias, batch_model_info
+    global bullish_probability_table
+    
+    # Only needed to deserialize the models, so import it where it is used
+    import joblib
     
     try:
-        # Load the trained model
-        model = joblib.load('models/stock_prediction_model.pkl')
-        logger.info("✅ Model loaded successfully")
-        
-        # Load the scaler
-        scaler = joblib.load('models/stock_scaler.pkl')
-        logger.info("✅ Scaler loaded successfully")
+        # Load the scaler + model pipeline, memory-mapping the estimator arrays
+        # so worker processes share them through the page cache instead of
+        # each holding a heap copy
+        pipeline = joblib.load('models/stock_prediction_pipeline.pkl', mmap_mode='r')
+        scaler = pipeline.named_steps['scaler']
+        model = pipeline.named_steps['model']
+        logger.info("✅ Model pipeline loaded successfully")
         
         # Load model metadata
-        with open('models/model_metadata.pkl', 'rb') as f:
-            model_metadata = pickle.load(f)
+        with open('models/model_metadata.json') as f:
+            model_metadata = json.load(f)
         logger.info("✅ Model metadata loaded successfully")
         
+        batch_model_info = {
+            "model_type": model_metadata.get('model_type', 'Unknown'),
+            "features_used": model_metadata.get('feature_names', [])
+        }
+        
+        # coef * (vix - mean) / scale + intercept == vix_weight * vix + vix_bias
+        coef = float(model.coef_[0, 0])
+        mean = float(scaler.mean_[0])
+        scale = float(scaler.scale_[0])
+        vix_weight = coef / scale
+        vix_bias = float(model.intercept_[0]) - coef * mean / scale
+        
+        # Evaluate the sigmoid once per table step in float64, store as float32
+        vix_grid = np.arange(VIX_TABLE_SIZE) / VIX_TABLE_SCALE
+        bullish_probability_table = (
+            1.0 / (1.0 + np.exp(-(vix_weight * vix_grid + vix_bias)))
+        ).astype(np.float32)
+        
     except Exception as e:
         logger.error(f"❌ Error loading models: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load ML models")
+        raise
+
+# Load at import so models are warm before the first request and workers
+# forked by `gunicorn --preload` share the loaded pages copy-on-write
+load_models()
 
-@app.on_event("startup")
-async def startup_event():
-    """Load models on startup"""
-    load_models()
+def predict_bullish_probability(vix_values):
+    """Probability of the bullish class (1) for an array of VIX values"""
+    # Nearest 0.01 step, clamped to the table's [0, 100] VIX range (values
+    # outside it get the end entries). Index from float64 input so the
+    # rounding matches predict_single_value exactly.
+    index = np.multiply(np.asarray(vix_values, dtype=np.float64), VIX_TABLE_SCALE)
+    np.clip(index, 0, VIX_TABLE_SIZE - 1, out=index)
+    np.rint(index, out=index)
+    return bullish_probability_table[index.astype(np.intp)]
+
+def predict_single_value(vix_value: float):
+    """(prediction, probability_bullish, probability_bearish) for one VIX value"""
+    index = round(min(max(vix_value * VIX_TABLE_SCALE, 0), VIX_TABLE_SIZE - 1))
+    probability_bullish = float(bullish_probability_table[index])
+    prediction = 1 if probability_bullish > 0.5 else 0
+    return prediction, probability_bullish, 1.0 - probability_bullish
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Return 422s through orjson, which writes echoed Infinity/NaN inputs as null"""
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
 
 @app.get("/health")
 async def health_check():
@@ -112,86 +176,95 @@ async def get_model_info():
         "description": "Stock market prediction model based on VIX volatility index"
     }
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_stock_movement(request: PredictionRequest):
+def score_vix_batch(vix_values, timestamps=None):
+    """Build the batch prediction response for a list of VIX values"""
+    # One timestamp for the whole request rather than one per sample
+    now_iso = datetime.now().isoformat()
+    if timestamps is None:
+        timestamps = [None] * len(vix_values)
+    
+    # Score the whole batch with one vectorized table gather
+    probability_bullish = predict_bullish_probability(vix_values)
+    probability_bearish = 1.0 - probability_bullish
+    
+    # Predicted class and its probability as the confidence score
+    prediction = np.greater(probability_bullish, 0.5).view(np.int8)
+    confidence = np.maximum(probability_bullish, probability_bearish)
+    
+    predictions = [
+        {
+            "prediction": pred,
+            "prediction_label": "bullish" if pred == 1 else "bearish",
+            "probability_bullish": p1,
+            "probability_bearish": p0,
+            "vix_value": vix_value,
+            "timestamp": timestamp or now_iso
+        }
+        for vix_value, timestamp, pred, p1, p0 in zip(
+            vix_values, timestamps, prediction.tolist(),
+            probability_bullish.tolist(), probability_bearish.tolist()
+        )
+    ]
+    
+    # Serialize straight through orjson rather than
+    # re-validating every prediction dict against PredictionResponse
+    return ORJSONResponse({
+        "predictions": predictions,
+        "confidence_scores": confidence.tolist(),
+        "model_info": {**batch_model_info, "prediction_count": len(predictions)},
+        "timestamp": now_iso
+    })
+
+@app.post("/predict", response_model=PredictionResponse, response_class=ORJSONResponse)
+def predict_stock_movement(request: PredictionRequest):
     """Predict stock movement based on VIX data"""
     if model is None or scaler is None:
         raise HTTPException(status_code=500, detail="ML models not loaded")
     
+    if request.timestamps is not None and len(request.timestamps) != len(request.vix):
+        raise HTTPException(status_code=400, detail="timestamps must be the same length as vix")
+    
     try:
-        predictions = []
-        confidence_scores = []
-        
-        for stock_data in request.stock_data:
-            # Extract VIX value
-            vix_value = stock_data.vix
-            
-            # Prepare features (currently only VIX)
-            features = np.array([[vix_value]])
-            
-            # Scale the features
-            features_scaled = scaler.transform(features)
-            
-            # Make prediction
-            prediction = model.predict(features_scaled)[0]
-            prediction_proba = model.predict_proba(features_scaled)[0]
-            
-            # Get confidence score (probability of the predicted class)
-            confidence = prediction_proba[prediction]
-            
-            # Determine prediction label
-            prediction_label = "bullish" if prediction == 1 else "bearish"
-            
-            predictions.append({
-                "prediction": int(prediction),
-                "prediction_label": prediction_label,
-                "probability_bullish": float(prediction_proba[1]),
-                "probability_bearish": float(prediction_proba[0]),
-                "vix_value": float(vix_value),
-                "timestamp": stock_data.timestamp or datetime.now().isoformat()
-            })
-            
-            confidence_scores.append(float(confidence))
+        return score_vix_batch(request.vix, request.timestamps)
         
-        return PredictionResponse(
-            predictions=predictions,
-            confidence_scores=confidence_scores,
-            model_info={
-                "model_type": model_metadata.get('model_type', 'Unknown'),
-                "features_used": model_metadata.get('feature_names', []),
-                "prediction_count": len(predictions)
-            },
-            timestamp=datetime.now().isoformat()
-        )
+    except Exception as e:
+        logger.error(f"❌ Prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@app.post("/predict-v1", response_model=PredictionResponse, response_class=ORJSONResponse)
+def predict_stock_movement_v1(request: LegacyPredictionRequest):
+    """Predict stock movement from the original per-item stock_data payload"""
+    if model is None or scaler is None:
+        raise HTTPException(status_code=500, detail="ML models not loaded")
+    
+    try:
+        vix_values = [stock_data.vix for stock_data in request.stock_data]
+        timestamps = [stock_data.timestamp for stock_data in request.stock_data]
+        return score_vix_batch(vix_values, timestamps)
         
     except Exception as e:
         logger.error(f"❌ Prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 @app.post("/predict-single")
-async def predict_single(vix_value: float):
+def predict_single(vix_value: FiniteFloat):
     """Simple endpoint for single VIX prediction"""
     if model is None or scaler is None:
         raise HTTPException(status_code=500, detail="ML models not loaded")
     
     try:
-        # Prepare features
-        features = np.array([[vix_value]])
-        features_scaled = scaler.transform(features)
-        
         # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        prediction_proba = model.predict_proba(features_scaled)[0]
-        confidence = prediction_proba[prediction]
+        prediction, probability_bullish, probability_bearish = predict_single_value(vix_value)
+        confidence = probability_bullish if prediction == 1 else probability_bearish
         
         prediction_label = "bullish" if prediction == 1 else "bearish"
         
         return {
-            "prediction": int(prediction),
+            "prediction": prediction,
             "prediction_label": prediction_label,
-            "confidence": float(confidence),
-            "probability_bullish": float(prediction_proba[1]),
-            "probability_bearish": float(prediction_proba[0]),
+            "confidence": confidence,
+            "probability_bullish": probability_bullish,
+            "probability_bearish": probability_bearish,
             "vix_value": vix_value,
             "timestamp": datetime.now().isoformat()
         }
@@ -201,29 +274,24 @@ async def predict_single(vix_value: float):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 @app.get("/predict-single")
-async def predict_single_get(vix_value: float):
+def predict_single_get(vix_value: FiniteFloat):
     """GET endpoint for single VIX prediction using query parameters"""
     if model is None or scaler is None:
         raise HTTPException(status_code=500, detail="ML models not loaded")
     
     try:
-        # Prepare features
-        features = np.array([[vix_value]])
-        features_scaled = scaler.transform(features)
-        
         # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        prediction_proba = model.predict_proba(features_scaled)[0]
-        confidence = prediction_proba[prediction]
+        prediction, probability_bullish, probability_bearish = predict_single_value(vix_value)
+        confidence = probability_bullish if prediction == 1 else probability_bearish
         
         prediction_label = "bullish" if prediction == 1 else "bearish"
         
         return {
-            "prediction": int(prediction),
+            "prediction": prediction,
             "prediction_label": prediction_label,
-            "confidence": float(confidence),
-            "probability_bullish": float(prediction_proba[1]),
-            "probability_bearish": float(prediction_proba[0]),
+            "confidence": confidence,
+            "probability_bullish": probability_bullish,
+            "probability_bearish": probability_bearish,
             "vix_value": vix_value,
             "timestamp": datetime.now().isoformat()
         }
@@ -5,47 +5,61 @@ This avoids version compatibility issues with the original model files
 """
 
 import joblib
-import pickle
+import json
 import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import Pipeline
 from datetime import datetime
 import os
 
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the sample generator runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+@njit(cache=True)
+def _generate_samples(n_samples, seed):
+    """Generate VIX values and noisy labels in a single fused pass"""
+    np.random.seed(seed)
+    vix_values = np.empty(n_samples, dtype=np.float64)
+    y_values = np.empty(n_samples, dtype=np.int64)
+    
+    for i in range(n_samples):
+        # Sample VIX value (volatility index typically ranges from 10-50)
+        vix = np.random.uniform(10, 50)
+        
+        # Higher VIX typically indicates bearish sentiment
+        y = 0 if vix > 25 else 1  # 0 = bearish, 1 = bullish
+        
+        # Flip some labels to make it more realistic
+        if np.random.random() < 0.1:
+            y = 1 - y
+        
+        vix_values[i] = vix
+        y_values[i] = y
+    
+    return vix_values, y_values
+
 def create_sample_data():
     """Create sample data similar to your original training data"""
-    np.random.seed(42)
-    
-    # Create sample VIX data (volatility index typically ranges from 10-50)
     n_samples = 1000
-    vix_values = np.random.uniform(10, 50, n_samples)
-    
-    # Create target variable (Y) based on VIX thresholds
-    # Higher VIX typically indicates bearish sentiment
-    y_values = np.where(vix_values > 25, 0, 1)  # 0 = bearish, 1 = bullish
+    vix_values, y_values = _generate_samples(n_samples, 42)
     
-    # Add some noise to make it more realistic
-    noise = np.random.normal(0, 0.1, n_samples)
-    y_values = np.where(np.random.random(n_samples) < 0.1, 1 - y_values, y_values)
-    
-    return pd.DataFrame({
-        'VIX': vix_values,
-        'Y': y_values
-    })
+    # Features as an (n_samples, 1) float32 VIX column, labels as 0/1
+    return vix_values.astype(np.float32).reshape(-1, 1), y_values.astype(np.int8)
 
 def train_model():
     """Train a new model with current environment"""
     print("🔄 Creating sample training data...")
-    df = create_sample_data()
-    
-    print(f"📊 Dataset shape: {df.shape}")
-    print(f"📈 Target distribution: {df['Y'].value_counts().to_dict()}")
+    X, y = create_sample_data()
     
-    # Prepare features and target
-    X = df[['VIX']]
-    y = df['Y']
+    labels, counts = np.unique(y, return_counts=True)
+    print(f"📊 Dataset shape: {X.shape}")
+    print(f"📈 Target distribution: {dict(zip(labels.tolist(), counts.tolist()))}")
     
     # Split the data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -54,48 +68,53 @@ def train_model():
     
     print("🔧 Training model...")
     
-    # Scale the features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    # Train the model
-    model = LogisticRegression(
-        random_state=42,
-        max_iter=200,
-        C=0.1,
-        class_weight='balanced',
-        solver='liblinear'
-    )
+    # Scale the features and train the model as one pipeline
+    pipeline = Pipeline([
+        ('scaler', StandardScaler()),
+        ('model', LogisticRegression(
+            random_state=42,
+            max_iter=200,
+            C=0.1,
+            class_weight='balanced',
+            solver='liblinear'
+        ))
+    ])
     
-    model.fit(X_train_scaled, y_train)
+    pipeline.fit(X_train, y_train)
     
     # Evaluate the model
-    train_score = model.score(X_train_scaled, y_train)
-    test_score = model.score(X_test_scaled, y_test)
+    train_score = pipeline.score(X_train, y_train)
+    test_score = pipeline.score(X_test, y_test)
     
+    model = pipeline.named_steps['model']
     print(f"✅ Model trained successfully!")
     print(f"📊 Training accuracy: {train_score:.3f}")
     print(f"📊 Test accuracy: {test_score:.3f}")
     print(f"🔢 Model coefficients: {model.coef_[0][0]:.4f}")
     print(f"🔢 Intercept: {model.intercept_[0]:.4f}")
     
-    return model, scaler
+    return pipeline
+
+def to_float32(pipeline):
+    """Store the fitted model and scaler parameters as float32"""
+    model = pipeline.named_steps['model']
+    scaler = pipeline.named_steps['scaler']
+    model.coef_ = model.coef_.astype(np.float32)
+    model.intercept_ = model.intercept_.astype(np.float32)
+    scaler.mean_ = scaler.mean_.astype(np.float32)
+    scaler.var_ = scaler.var_.astype(np.float32)
+    scaler.scale_ = scaler.scale_.astype(np.float32)
 
-def save_model_files(model, scaler):
+def save_model_files(pipeline):
     """Save the model files"""
     print("💾 Saving model files...")
     
     # Create models directory if it doesn't exist
     os.makedirs('models', exist_ok=True)
     
-    # Save the model
-    joblib.dump(model, 'models/stock_prediction_model.pkl')
-    print("✅ Model saved: models/stock_prediction_model.pkl")
-    
-    # Save the scaler
-    joblib.dump(scaler, 'models/stock_scaler.pkl')
-    print("✅ Scaler saved: models/stock_scaler.pkl")
+    # Save the scaler + model pipeline (uncompressed so the service can memory-map it)
+    joblib.dump(pipeline, 'models/stock_prediction_pipeline.pkl', compress=0)
+    print("✅ Pipeline saved: models/stock_prediction_pipeline.pkl")
     
     # Save model metadata
     model_metadata = {
@@ -115,28 +134,41 @@ def save_model_files(model, scaler):
         }
     }
     
-    with open('models/model_metadata.pkl', 'wb') as f:
-        pickle.dump(model_metadata, f)
-    print("✅ Metadata saved: models/model_metadata.pkl")
+    with open('models/model_metadata.json', 'w') as f:
+        json.dump(model_metadata, f, indent=2)
+    print("✅ Metadata saved: models/model_metadata.json")
 
-def test_model(model, scaler):
+def export_onnx_model(pipeline):
+    """Export the scaler + model pipeline as a single ONNX graph"""
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+    except ImportError:
+        print("⏭️  skl2onnx not installed, skipping ONNX export")
+        return
+    
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=[('vix', FloatTensorType([None, 1]))],
+        options={id(pipeline.named_steps['model']): {'zipmap': False}}
+    )
+    
+    with open('models/stock_prediction_model.onnx', 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    print("✅ ONNX model saved: models/stock_prediction_model.onnx")
+
+def test_model(pipeline):
     """Test the model with sample predictions"""
     print("\n🧪 Testing model predictions...")
     
-    # Test with different VIX values
-    test_vix_values = [15, 20, 25, 30, 35, 40]
+    # Test with different VIX values, scored in a single call
+    test_vix_values = np.array([[15], [20], [25], [30], [35], [40]], dtype=np.float32)
+    prediction_proba = pipeline.predict_proba(test_vix_values)
+    predictions = prediction_proba.argmax(axis=1)
     
-    for vix in test_vix_values:
-        # Prepare features
-        features = np.array([[vix]])
-        features_scaled = scaler.transform(features)
-        
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        prediction_proba = model.predict_proba(features_scaled)[0]
-        
+    for vix, prediction, proba in zip(test_vix_values[:, 0], predictions, prediction_proba):
         prediction_label = "BULLISH" if prediction == 1 else "BEARISH"
-        confidence = prediction_proba[prediction]
+        confidence = proba[prediction]
         
         print(f"VIX: {vix:2.0f} → {prediction_label} (Confidence: {confidence:.3f})")
 
@@ -147,13 +179,15 @@ def main():
     
     try:
         # Train the model
-        model, scaler = train_model()
+        pipeline = train_model()
+        to_float32(pipeline)
         
         # Save the model files
-        save_model_files(model, scaler)
+        save_model_files(pipeline)
+        export_onnx_model(pipeline)
         
         # Test the model
-        test_model(model, scaler)
+        test_model(pipeline)
         
         print("\n🎉 Model recreation completed successfully!")
         print("📁 Model files saved in models/ directory")
@@ -53,6 +53,77 @@ def test_ml_service(base_url="https://finance-ml-service.onrender.com"):
             print(f"   ❌ Error: {response.text}")
     except Exception as e:
         print(f"   ❌ POST predict-single failed: {e}")
+    
+    # Test 5: POST predict endpoint (flat vix/timestamps lists)
+    print("\n5. Testing POST predict endpoint...")
+    try:
+        payload = {
+            "vix": [25.5, 30.2],
+            "timestamps": ["2024-01-01T10:00:00Z", "2024-01-01T11:00:00Z"]
+        }
+        response = requests.post(f"{base_url}/predict", json=payload)
+        print(f"   Status: {response.status_code}")
+        if response.status_code == 200:
+            data = response.json()
+            count = len(data["predictions"])
+            timestamps = [p["timestamp"] for p in data["predictions"]]
+            if count == 2 and timestamps == payload["timestamps"]:
+                print(f"   ✅ Predictions: {data['predictions']}")
+            else:
+                print(f"   ❌ Unexpected predictions: {data['predictions']}")
+        else:
+            print(f"   ❌ Error: {response.text}")
+    except Exception as e:
+        print(f"   ❌ POST predict failed: {e}")
+    
+    # Test 6: POST predict-v1 endpoint (original stock_data payload)
+    print("\n6. Testing POST predict-v1 endpoint...")
+    try:
+        payload = {
+            "stock_data": [
+                {"vix": 25.5, "timestamp": "2024-01-01T10:00:00Z"},
+                {"vix": 30.2}
+            ]
+        }
+        response = requests.post(f"{base_url}/predict-v1", json=payload)
+        print(f"   Status: {response.status_code}")
+        if response.status_code == 200 and len(response.json()["predictions"]) == 2:
+            print(f"   ✅ Predictions: {response.json()['predictions']}")
+        else:
+            print(f"   ❌ Error: {response.text}")
+    except Exception as e:
+        print(f"   ❌ POST predict-v1 failed: {e}")
+    
+    # Test 7: POST predict rejects timestamps of a different length
+    print("\n7. Testing POST predict with mismatched timestamps...")
+    try:
+        payload = {"vix": [25.5, 30.2], "timestamps": ["2024-01-01T10:00:00Z"]}
+        response = requests.post(f"{base_url}/predict", json=payload)
+        print(f"   Status: {response.status_code}")
+        if response.status_code == 400:
+            print(f"   ✅ Rejected: {response.json()}")
+        else:
+            print(f"   ❌ Expected 400, got: {response.text}")
+    except Exception as e:
+        print(f"   ❌ Mismatched timestamps check failed: {e}")
+    
+    # Test 8: predict and predict-single agree for the same VIX values
+    print("\n8. Testing predict and predict-single agree...")
+    try:
+        test_vix_values = [1.015, 15, 24.995, 26.7776, 30.2, 45.125]
+        response = requests.post(f"{base_url}/predict", json={"vix": test_vix_values})
+        batch = [p["probability_bullish"] for p in response.json()["predictions"]]
+        mismatches = []
+        for vix, batch_probability in zip(test_vix_values, batch):
+            single = requests.get(f"{base_url}/predict-single", params={"vix_value": vix}).json()
+            if single["probability_bullish"] != batch_probability:
+                mismatches.append((vix, batch_probability, single["probability_bullish"]))
+        if mismatches:
+            print(f"   ❌ Mismatches (vix, predict, predict-single): {mismatches}")
+        else:
+            print(f"   ✅ All {len(test_vix_values)} values agree")
+    except Exception as e:
+        print(f"   ❌ Agreement check failed: {e}")
 
 if __name__ == "__main__":
     test_ml_service()
\ No newline at end of file
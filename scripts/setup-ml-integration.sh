@@ -38,18 +38,13 @@ fi
 
 # Check if model files exist
 echo "🔍 Checking for model files..."
-if [ ! -f "models/stock_prediction_model.pkl" ]; then
-    echo "⚠️  Warning: stock_prediction_model.pkl not found in models/ directory"
-    echo "   Please export your trained model from Google Colab and place it in models/"
+if [ ! -f "models/stock_prediction_pipeline.pkl" ]; then
+    echo "⚠️  Warning: stock_prediction_pipeline.pkl not found in models/ directory"
+    echo "   Please export your fitted scaler + model pipeline from Google Colab and place it in models/"
 fi
 
-if [ ! -f "models/stock_scaler.pkl" ]; then
-    echo "⚠️  Warning: stock_scaler.pkl not found in models/ directory"
-    echo "   Please export your fitted scaler from Google Colab and place it in models/"
-fi
-
-if [ ! -f "models/model_metadata.pkl" ]; then
-    echo "⚠️  Warning: model_metadata.pkl not found in models/ directory"
+if [ ! -f "models/model_metadata.json" ]; then
+    echo "⚠️  Warning: model_metadata.json not found in models/ directory"
     echo "   Please export your model metadata from Google Colab and place it in models/"
 fi
 
@@ -11,10 +11,8 @@ export interface StockPrediction {
 }
 
 export interface BatchPredictionRequest {
-  stock_data: Array<{
-    vix: number;
-    timestamp?: string;
-  }>;
+  vix: number[];
+  timestamps?: string[];
 }
 
 export interface BatchPredictionResponse {
@@ -94,7 +92,7 @@ class MLPredictionService {
   async predictBatch(vixValues: number[]): Promise<BatchPredictionResponse | null> {
     try {
       const request: BatchPredictionRequest = {
-        stock_data: vixValues.map(vix => ({ vix }))
+        vix: vixValues
       };
 
       const response = await axios.post(`${this.baseURL}/predict`, request);
@@ -113,7 +111,8 @@ class MLPredictionService {
   ): Promise<BatchPredictionResponse | null> {
     try {
       const request: BatchPredictionRequest = {
-        stock_data: data
+        vix: data.map(item => item.vix),
+        timestamps: data.map(item => item.timestamp)
       };
 
       const response = await axios.post(`${this.baseURL}/predict`, request);